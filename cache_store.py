@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import orjson
+import zstandard as zstd
+
+from logger import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedule (
+    group_name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    etag TEXT,
+    body BLOB NOT NULL,
+    mtime INTEGER NOT NULL,
+    PRIMARY KEY (group_name, date)
+) WITHOUT ROWID
+"""
+
+
+# Кэш расписаний в одном файле SQLite вместо файла на каждую пару (группа, дата).
+# Методы синхронные и вызываются из пула потоков: у каждого потока своё
+# соединение, а режим WAL позволяет читателям не ждать писателя.
+# Тело записи хранится сжатым zstd: повторяющиеся ключи JSON сжимаются в разы.
+class CacheStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def open(self):
+        # Каталог и схема создаются один раз при старте, а не на пути запроса.
+        # Флаг готовности ставится только после создания таблицы
+        with self._lock:
+            if self._ready:
+                return
+            os.makedirs(self.path.parent, exist_ok=True)
+            conn = sqlite3.connect(self.path)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(_SCHEMA)
+            finally:
+                conn.close()
+            self._ready = True
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        if not self._ready:
+            self.open()
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._connections.append(conn)
+        self._local.conn = conn
+        # Контексты zstd не потокобезопасны, поэтому тоже свои у каждого потока
+        self._local.compressor = zstd.ZstdCompressor(level=3)
+        self._local.decompressor = zstd.ZstdDecompressor()
+        return conn
+
+    def get(self, group: str, date: str) -> dict | None:
+        try:
+            row = self._connect().execute(
+                "SELECT etag, body, mtime FROM schedule WHERE group_name = ? AND date = ?",
+                (group, date),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка чтения кэша: {e}")
+            return None
+        if row is None:
+            return None
+        etag, body, mtime = row
+        try:
+            schedule = orjson.loads(self._local.decompressor.decompress(body))
+        except (zstd.ZstdError, orjson.JSONDecodeError):
+            return None
+        return {"etag": etag, "mtime": mtime, "schedule": schedule}
+
+    def put(self, group: str, date: str, schedule: list, etag: str):
+        try:
+            conn = self._connect()
+            body = self._local.compressor.compress(orjson.dumps(schedule))
+            conn.execute(
+                "INSERT OR REPLACE INTO schedule (group_name, date, etag, body, mtime) VALUES (?, ?, ?, ?, ?)",
+                (group, date, etag, body, int(time.time())),
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка сохранения кэша: {e}")
+
+    def touch(self, group: str, date: str):
+        try:
+            self._connect().execute(
+                "UPDATE schedule SET mtime = ? WHERE group_name = ? AND date = ?",
+                (int(time.time()), group, date),
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка обновления кэша: {e}")
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -12,7 +12,10 @@ class Settings(BaseSettings):
     CACHE_TTL: int = 86400  # 24 hours
 
     PLAYWRIGHT_TIMEOUT: int = 60000
+    SCHEDULE_WAIT_TIMEOUT: int = 10000
     BROWSER_HEADLESS: bool = True
+    POOL_SIZE: int = 4
+    POOL_ACQUIRE_TIMEOUT: int = 60000
 
     class Config:
         env_file = ".env"
@@ -1,135 +1,438 @@
 import asyncio
-import os
-import json
+import hashlib
 import time
 import re
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
 from urllib.parse import quote
+import orjson
+from cachetools import TLRUCache
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError, Browser
 
 from fastapi import FastAPI, HTTPException, Query
 from datetime import datetime, timedelta
 
+from cache_store import CacheStore
 from config import settings
 from logger import setup_logging, logger
 
 setup_logging()
 
+
+# Занятие в расписании. slots экономят память, а orjson и FastAPI
+# сериализуют dataclass напрямую, без промежуточного dict
+@dataclass(slots=True)
+class Lesson:
+    period: str
+    time: str
+    type: str
+    subject: str
+    room: str
+    teacher: str
+    groups: list[str]
+
+
+_TIME_SUBJECT_RE = re.compile(r"(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})\s*(.+)")
+_GROUP_FALLBACK_RE = re.compile(r"^[А-ЯЁа-яёA-Za-z0-9-]+$")
+
+# Ресурсы, не влияющие на текст расписания. Стили не блокируем:
+# без них ломается раскладка и всплывающие подсказки при наведении
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+_TRACKER_RE = re.compile(r"(google-analytics|googletagmanager|doubleclick|mc\.yandex\.ru|yandex\.ru/metrika)")
+
+_BLOCK_SELECTOR = 'div.TimeLine_fullcalendarText__fm4tW'
+# Истинно, когда число блоков расписания не менялось пять кадров подряд
+_BLOCKS_STABLE_JS = """
+(selector) => {
+    const count = document.querySelectorAll(selector).length;
+    const state = window.__scheduleBlocks || (window.__scheduleBlocks = {count: -1, frames: 0});
+    if (state.count === count) {
+        state.frames += 1;
+    } else {
+        state.count = count;
+        state.frames = 0;
+    }
+    return state.frames >= 5;
+}
+"""
+# Извлекает все блоки расписания за один вызов вместо нескольких RPC на блок
+_EXTRACT_BLOCKS_JS = """
+(selector) => {
+    // У скрытого элемента innerText совпадает с textContent и теряет переводы
+    // строк, поэтому повторяем его разбиение сами: блочные элементы дают
+    // обязательный перенос (p — два), соседние переносы схлопываются в наибольший,
+    // br — отдельный перенос. Пустые строки между блоками сохраняются, как у
+    // innerText: по первой из них парсер закрывает список групп
+    const INLINE_TAGS = new Set(['A', 'B', 'CODE', 'EM', 'I', 'SMALL', 'SPAN', 'STRONG', 'SUB', 'SUP']);
+    const collect = (node, out) => {
+        if (node.nodeType === Node.TEXT_NODE) {
+            out.push(node.textContent.replace(/\s+/g, ' '));
+            return;
+        }
+        if (node.nodeType !== Node.ELEMENT_NODE) return;
+        if (node.tagName === 'BR') {
+            // Завершающий br непустого блока, как и в браузере, пустой строки не даёт
+            if (node.nextSibling || !node.previousSibling) out.push('\n');
+            return;
+        }
+        const breaks = INLINE_TAGS.has(node.tagName) ? 0 : node.tagName === 'P' ? 2 : 1;
+        if (breaks) out.push(breaks);
+        node.childNodes.forEach(child => collect(child, out));
+        if (breaks) out.push(breaks);
+    };
+    const textOf = (el) => {
+        if (!el) return null;
+        if (el.getClientRects().length) return el.innerText;
+        const out = [];
+        el.childNodes.forEach(child => collect(child, out));
+        while (out.length && typeof out[0] === 'number') out.shift();
+        while (out.length && typeof out[out.length - 1] === 'number') out.pop();
+        // Пробельные узлы между блоками (отступы разметки) строк не дают
+        let text = '';
+        let pending = 0;
+        let space = false;
+        for (const item of out) {
+            if (typeof item === 'number') {
+                pending = Math.max(pending, item);
+                space = false;
+            } else if (item !== '\n' && !item.trim()) {
+                space = !pending;
+            } else {
+                text += pending ? '\n'.repeat(pending) : space ? ' ' : '';
+                text += item;
+                pending = 0;
+                space = false;
+            }
+        }
+        const lines = text.split('\n').map(line => line.trim());
+        while (lines.length && !lines[0]) lines.shift();
+        while (lines.length && !lines[lines.length - 1]) lines.pop();
+        return lines.join('\n');
+    };
+    // Скрытые подсказки читаем прямо из DOM, чтобы не наводить курсор на каждый блок
+    const tooltipOf = (b) => {
+        const describedBy = b.getAttribute('aria-describedby');
+        const described = describedBy && document.getElementById(describedBy);
+        return b.dataset.tooltip
+            || textOf(b.querySelector('[role="tooltip"]'))
+            || textOf(described)
+            || null;
+    };
+    const blocks = Array.from(document.querySelectorAll(selector));
+    return {
+        blocks: blocks.map(b => ({
+            title: b.querySelector('strong.TimeLine_eventTitle__oq7tU')?.innerText ?? null,
+            room: b.querySelector('div[style="white-space: nowrap;"] strong')?.innerText ?? null,
+            tooltip: tooltipOf(b),
+        })),
+    };
+}
+"""
+
 class PlaywrightManager:
     def __init__(self):
         self.playwright = None
         self.browser = None
+        self.pool = []
+        self._idle = []
+        self._cond = asyncio.Condition()
+        self._launch_lock = asyncio.Lock()
 
     async def start(self):
         self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-            headless=settings.BROWSER_HEADLESS,
-            args=['--disable-blink-features=AutomationControlled']
-        )
-        logger.info("Браузер Playwright успешно запущен")
+        await self._launch_browser()
+        await asyncio.gather(*[self._spawn() for _ in range(settings.POOL_SIZE)])
+        logger.info(f"Браузер Playwright успешно запущен, страниц в пуле: {len(self.pool)}")
 
     async def stop(self):
+        for context, _ in self.pool:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self.pool.clear()
+        self._idle.clear()
         if self.browser:
             await self.browser.close()
         if self.playwright:
             await self.playwright.stop()
         logger.info("Браузер Playwright остановлен")
 
-    async def get_new_page(self):
-        if not self.browser:
-            await self.start()
+    async def _launch_browser(self):
+        self.browser = await self.playwright.chromium.launch(
+            headless=settings.BROWSER_HEADLESS,
+            args=['--disable-blink-features=AutomationControlled']
+        )
+
+    async def _ensure_browser(self):
+        if self.browser.is_connected():
+            return
+        async with self._launch_lock:
+            if self.browser.is_connected():
+                return
+            logger.warning("Браузер Playwright отключился, перезапускаем")
+            # Страницы старого браузера мертвы: свободные слоты становятся пустыми
+            self.pool.clear()
+            async with self._cond:
+                self._idle[:] = [None] * len(self._idle)
+            await self._launch_browser()
+
+    async def _new_entry(self):
+        await self._ensure_browser()
         context = await self.browser.new_context(
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
             viewport={"width": 1920, "height": 1080},
             device_scale_factor=1,
         )
-        return await context.new_page()
+        try:
+            await context.route("**/*", self._filter_route)
+            page = await context.new_page()
+        except Exception:
+            await context.close()
+            raise
+        entry = (context, page)
+        self.pool.append(entry)
+        return entry
+
+    async def _spawn(self):
+        try:
+            entry = await self._new_entry()
+        except Exception as e:
+            # Слот не теряем: страница будет создана при следующей выдаче
+            logger.error(f"Не удалось создать страницу пула: {e}")
+            entry = None
+        await self._release(entry)
+
+    async def _release(self, entry):
+        async with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    @staticmethod
+    async def _filter_route(route):
+        request = route.request
+        if request.resource_type in _BLOCKED_RESOURCE_TYPES or _TRACKER_RE.search(request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _recycle(self, entry):
+        context, page = entry
+        try:
+            await page.goto("about:blank")
+            await context.clear_cookies()
+        except Exception as e:
+            # Страница или контекст сломались — возвращаем пустой слот,
+            # новая страница создастся при следующей выдаче
+            logger.warning(f"Не удалось очистить страницу пула, пересоздадим: {e}")
+            if entry in self.pool:
+                self.pool.remove(entry)
+            try:
+                await context.close()
+            except Exception:
+                pass
+            entry = None
+        await self._release(entry)
+
+    @asynccontextmanager
+    async def acquire(self):
+        if not self.browser:
+            await self.start()
+        async with self._cond:
+            await asyncio.wait_for(
+                self._cond.wait_for(lambda: self._idle),
+                timeout=settings.POOL_ACQUIRE_TIMEOUT / 1000,
+            )
+            entry = self._idle.pop()
+        if entry is None:
+            try:
+                entry = await self._new_entry()
+            except Exception:
+                await self._release(None)
+                raise
+        try:
+            yield entry[1]
+        finally:
+            await self._recycle(entry)
 
 pw_manager = PlaywrightManager()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await asyncio.to_thread(cache_store.open)
     await pw_manager.start()
     yield
     await pw_manager.stop()
+    cache_store.close()
 
 app = FastAPI(title=settings.APP_TITLE, lifespan=lifespan)
 
-CACHE_DIR = settings.CACHE_DIR
+CACHE_DIR = Path(settings.CACHE_DIR)
 CACHE_TTL = settings.CACHE_TTL
 
-def is_cache_valid(cache_filename: str) -> bool:
-    if not os.path.exists(cache_filename):
-        return False
-    return (time.time() - os.path.getmtime(cache_filename)) < CACHE_TTL
+cache_store = CacheStore(CACHE_DIR / "schedule.db")
 
+# Процессный кэш поверх SQLite: повторные запросы не трогают диск.
+# Запись живёт до mtime + CACHE_TTL строки на диске, а не полный TTL с момента
+# копирования в память, иначе расписание отдавалось бы до 2×CACHE_TTL без перепроверки.
+# TLRUCache не потокобезопасен, поэтому обращаемся к нему только из цикла событий
+_MEM = TLRUCache(maxsize=2048, ttu=lambda _key, value, _now: value[0], timer=time.time)
+# Незавершённые загрузки: параллельные запросы одного дня ждут общий результат
+_inflight: dict[tuple[str, str], asyncio.Task] = {}
 
-def load_from_cache(group: str, date: str) -> dict | None:
-    safe_group = re.sub(r'[^A-Za-z0-9-А-Яа-яёЁ]', '_', group)
-    cache_filename = os.path.join(CACHE_DIR, f"{safe_group}_{date}.json")
-    if is_cache_valid(cache_filename):
-        try:
-            with open(cache_filename, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return None
+def _remember(key: tuple[str, str], schedule: list[Lesson], mtime: float):
+    _MEM[key] = (mtime + CACHE_TTL, schedule)
+
+
+def is_cache_valid(mtime: int) -> bool:
+    return (time.time() - mtime) < CACHE_TTL
+
+
+def _hash_payload(blocks: list) -> str:
+    return hashlib.blake2b(orjson.dumps(blocks), digest_size=16).hexdigest()
+
+
+def _block_title(block: dict) -> str:
+    return block["title"].strip() if block["title"] is not None else "Нет данных"
+
+
+def _period_from_title(title: str) -> str | None:
+    if ":" not in title and "-" not in title:
+        title_lower = title.lower()
+        if "неделя" in title_lower:
+            return title
+        elif "сессия" in title_lower:
+            return "Сессия"
     return None
 
 
-def save_to_cache(group: str, date: str, schedule: list):
-    if not os.path.exists(CACHE_DIR):
-        os.makedirs(CACHE_DIR)
-    safe_group = re.sub(r'[^A-Za-z0-9-А-Яа-яёЁ]', '_', group)
-    cache_filename = os.path.join(CACHE_DIR, f"{safe_group}_{date}.json")
+def _to_lessons(items: list) -> list[Lesson] | None:
     try:
-        with open(cache_filename, "w", encoding="utf-8") as f:
-            json.dump(schedule, f, ensure_ascii=False, indent=2)
-    except IOError as e:
-        logger.error(f"Ошибка сохранения кэша: {e}")
+        return [Lesson(**item) for item in items]
+    except TypeError:
+        # Запись с устаревшим набором полей считаем промахом кэша
+        return None
+
+
+def read_cache_entry(group: str, date: str) -> dict | None:
+    entry = cache_store.get(group, date)
+    if entry is None:
+        return None
+    entry["schedule"] = _to_lessons(entry["schedule"])
+    return entry if entry["schedule"] is not None else None
+
+
+def load_from_cache(group: str, date: str) -> tuple[list[Lesson], int] | None:
+    entry = cache_store.get(group, date)
+    if entry is None or not is_cache_valid(entry["mtime"]):
+        return None
+    schedule = _to_lessons(entry["schedule"])
+    return (schedule, entry["mtime"]) if schedule is not None else None
+
+
+def touch_cache(group: str, date: str):
+    cache_store.touch(group, date)
+
+
+def save_to_cache(group: str, date: str, schedule: list[Lesson], etag: str):
+    cache_store.put(group, date, schedule, etag)
 
 
+# Ключ сортировки для занятий без распознанного времени — в конец списка
+_NO_TIME_KEY = 1 << 30
+
 def parse_time_to_minutes(time_str: str) -> int:
-    try:
-        start_time = time_str.split(" - ")[0]
-        hours, minutes = map(int, start_time.split(":"))
-        return hours * 60 + minutes
-    except (ValueError, IndexError):
-        return float('inf')
-
-async def get_day_schedule(group: str, date: str) -> list:
-    cached_schedule = load_from_cache(group, date)
-    if cached_schedule is not None:
+    start_time = time_str.split(" - ", 1)[0]
+    hours, _, minutes = start_time.partition(":")
+    if hours.isdigit() and minutes.isdigit():
+        return int(hours) * 60 + int(minutes)
+    return _NO_TIME_KEY
+
+async def get_day_schedule(group: str, date: str) -> list[Lesson]:
+    key = (group, date)
+    cached = _MEM.get(key)
+    if cached is not None:
+        return cached[1]
+    # Кэш на диске читаем в пуле потоков, чтобы не блокировать цикл событий
+    cached = await asyncio.to_thread(load_from_cache, group, date)
+    if cached is not None:
+        cached_schedule, mtime = cached
+        _remember(key, cached_schedule, mtime)
         return cached_schedule
-    
+
+    task = _inflight.get(key)
+    if task is None:
+        # Загрузка идёт отдельной задачей: если первый запрос отменят,
+        # остальные ожидающие всё равно получат результат
+        task = asyncio.create_task(_scrape_day_schedule(group, date))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _forget_inflight(key, t))
+    try:
+        return await asyncio.shield(task)
+    except asyncio.TimeoutError:
+        logger.error(f"Нет свободной страницы браузера для {group} на {date}")
+        raise HTTPException(status_code=503, detail="Сервис перегружен, попробуйте позже.")
+
+
+def _forget_inflight(key: tuple[str, str], task: asyncio.Task):
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    # Помечаем исключение полученным: ожидающих к этому моменту может не остаться
+    if not task.cancelled():
+        task.exception()
+
+
+async def _scrape_day_schedule(group: str, date: str) -> list[Lesson]:
     encoded_group = quote(group)
     url = f"https://schedule-of.mirea.ru/?scheduleTitle={encoded_group}&date={date}"
-    
-    page = await pw_manager.get_new_page()
-    try:
+
+    async with pw_manager.acquire() as page:
         try:
-            await page.goto(url, wait_until="networkidle", timeout=settings.PLAYWRIGHT_TIMEOUT)
-            await page.wait_for_load_state("domcontentloaded")
-            await asyncio.sleep(1)
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await asyncio.sleep(0.5)
-            schedule_blocks = await page.query_selector_all('div.TimeLine_fullcalendarText__fm4tW')
-            if not schedule_blocks:
-                return []
-            
+            await page.goto(url, wait_until="domcontentloaded", timeout=settings.PLAYWRIGHT_TIMEOUT)
+            # Признака пустого дня на странице нет, поэтому «расписание загружено»
+            # проверяем так: сеть затихла (данные пришли), а число блоков не меняется
+            # несколько кадров подряд (отрисовка закончена). Только такой результат,
+            # в том числе пустой день, попадает в кэш
+            loaded = True
+            try:
+                await page.wait_for_load_state("networkidle", timeout=settings.PLAYWRIGHT_TIMEOUT)
+                await page.wait_for_function(
+                    _BLOCKS_STABLE_JS,
+                    arg=_BLOCK_SELECTOR,
+                    polling="raf",
+                    timeout=settings.SCHEDULE_WAIT_TIMEOUT,
+                )
+            except PlaywrightTimeoutError:
+                loaded = False
+                logger.warning(f"Не удалось дождаться загрузки расписания, результат не кэшируется: {group} на {date}")
+            data = await page.evaluate(_EXTRACT_BLOCKS_JS, _BLOCK_SELECTOR)
+
+            # Хэшируем извлечённые заголовки, аудитории и подсказки: если они не
+            # изменились, отдаём сохранённый результат без повторного разбора.
+            # Если подсказку хотя бы одного занятия можно получить только наведением,
+            # хэш не покрывает преподавателя и группы — тогда разбираем заново
+            etag = _hash_payload(data["blocks"])
+            hash_covers_all = all(
+                block["tooltip"] or _period_from_title(_block_title(block)) for block in data["blocks"]
+            )
+            stale_entry = await asyncio.to_thread(read_cache_entry, group, date) if loaded and hash_covers_all else None
+            if stale_entry is not None and stale_entry.get("etag") == etag:
+                _remember((group, date), stale_entry["schedule"], time.time())
+                await asyncio.to_thread(touch_cache, group, date)
+                return stale_entry["schedule"]
+
+            block_locator = page.locator(_BLOCK_SELECTOR)
             schedule = []
             period = "Не указан"
-            for block in schedule_blocks:
-                time_subject_elem = await block.query_selector('strong.TimeLine_eventTitle__oq7tU')
-                time_subject_text = (
-                    await time_subject_elem.inner_text()).strip() if time_subject_elem else "Нет данных"
-                if "неделя" in time_subject_text.lower() and not any(char in time_subject_text for char in [":", "-"]):
-                    period = time_subject_text
-                    continue
-                elif "сессия" in time_subject_text.lower() and not any(
-                        char in time_subject_text for char in [":", "-"]):
-                    period = "Сессия"
+            for index, block in enumerate(data["blocks"]):
+                time_subject_text = _block_title(block)
+                block_period = _period_from_title(time_subject_text)
+                if block_period is not None:
+                    period = block_period
                     continue
-                time_match = re.match(r"(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})\s*(.+)", time_subject_text)
+                time_match = _TIME_SUBJECT_RE.match(time_subject_text)
                 if time_match:
                     start_time, end_time, subject_raw = time_match.groups()
                     current_time = f"{start_time} - {end_time}"
@@ -152,74 +455,114 @@ async def get_day_schedule(group: str, date: str) -> list:
                     elif len(parts) == 1:
                         subject_name = parts[0]
                 subject_name = subject_name.strip()
-                details_block = await block.query_selector('div[style="white-space: nowrap;"]')
-                room = await details_block.query_selector('strong') if details_block else None
-                room = (await room.inner_text()).strip() if room else "Нет данных"
-                await block.hover()
-                await asyncio.sleep(0.3)
-                try:
-                    dialog = await page.wait_for_selector('div[role="dialog"]', timeout=3000)
-                    extra_info = (await dialog.inner_text()).strip().split("\n") if dialog else []
-                    await page.mouse.click(0, 0)
-                except PlaywrightTimeoutError:
-                    extra_info = []
+                room = block["room"].strip() if block["room"] is not None else "Нет данных"
+
+                if block["tooltip"]:
+                    extra_info = block["tooltip"].strip().split("\n")
+                else:
+                    # Подсказки нет в DOM — открываем диалог наведением
+                    await block_locator.nth(index).hover()
+                    try:
+                        dialog = await page.wait_for_selector('div[role="dialog"]', timeout=1500)
+                        extra_info = (await dialog.inner_text()).strip().split("\n") if dialog else []
+                    except PlaywrightTimeoutError:
+                        extra_info = []
+                    else:
+                        # Ждём, пока диалог закроется, иначе следующее наведение
+                        # может прочитать его же, пока он ещё исчезает
+                        await page.mouse.click(0, 0)
+                        try:
+                            await page.wait_for_selector('div[role="dialog"]', state="hidden", timeout=1500)
+                        except PlaywrightTimeoutError:
+                            logger.warning(f"Диалог занятия не закрылся: {group} на {date}")
 
                 teacher = "Нет данных"
                 groups = ["Нет данных о группах"]
 
                 if extra_info:
-                    for line in extra_info:
-                        if "Преподаватель:" in line:
-                            teacher = line.replace("Преподаватель:", "").strip()
-                            break
-
-                    groups_section = False
+                    # Один проход: преподаватель и список групп до первой пустой строки
                     groups = []
+                    teacher_found = groups_section = groups_done = False
                     for line in extra_info:
-                        if "Группы:" in line:
+                        line = line.strip()
+                        if not teacher_found and line.startswith("Преподаватель:"):
+                            teacher = line[len("Преподаватель:"):].strip()
+                            teacher_found = True
+                        elif groups_section:
+                            if not line:
+                                groups_section = False
+                                groups_done = True
+                            elif "БАСО-" in line:
+                                groups.append(line)
+                        elif not groups_done and line.startswith("Группы:"):
                             groups_section = True
-                            continue
-                        if groups_section and line.strip():
-                            if "БАСО-" in line:
-                                groups.append(line.strip())
-                        elif groups_section and not line.strip():
+                        if teacher_found and groups_done:
                             break
                     if not groups:
                         groups = ["Нет данных о группах"]
 
-                schedule.append({
-                    "period": period,
-                    "time": current_time,
-                    "type": lesson_type,
-                    "subject": subject_name,
-                    "room": room,
-                    "teacher": teacher,
-                    "groups": groups
-                })
-
-            schedule.sort(key=lambda x: parse_time_to_minutes(x["time"]))
-            save_to_cache(group, date, schedule)
+                schedule.append(Lesson(
+                    period=period,
+                    time=current_time,
+                    type=lesson_type,
+                    subject=subject_name,
+                    room=room,
+                    teacher=teacher,
+                    groups=groups,
+                ))
+
+            schedule.sort(key=lambda x: parse_time_to_minutes(x.time))
+            if loaded:
+                _remember((group, date), schedule, time.time())
+                await asyncio.to_thread(save_to_cache, group, date, schedule, etag)
             return schedule
 
         except Exception as e:
             logger.error(f"Ошибка при парсинге {group} на {date}: {e}")
             return []
-    finally:
-        await page.close()
-        await page.context.close()
+
 GROUP_REGEX = re.compile(r"^[А-Я]{4}-\d{2}-\d{2}$")
 
-def validate_group(group: str):
-    if not GROUP_REGEX.match(group):
-        if not (3 <= len(group) <= 15 and re.match(r"^[А-ЯЁа-яёA-Za-z0-9-]+$", group)):
-            raise HTTPException(
-                status_code=400, 
-                detail="Неверный формат группы. Пример корректного формата: БАСО-03-24."
-            )
+@lru_cache(maxsize=2048)
+def validate_group(group: str) -> bool:
+    # Кэшируются только успешные проверки: исключение lru_cache не запоминает.
+    # Длина проверяется до регулярных выражений, строгий шаблон — до запасного
+    if not (3 <= len(group) <= 15 and (GROUP_REGEX.match(group) or _GROUP_FALLBACK_RE.match(group))):
+        raise HTTPException(
+            status_code=400, 
+            detail="Неверный формат группы. Пример корректного формата: БАСО-03-24."
+        )
+    return True
+
+@lru_cache(maxsize=512)
+def _parse_date(date_str: str) -> datetime:
+    return datetime.strptime(date_str, "%Y-%m-%d")
+
+
+# Текущая дата пересчитывается не чаще раза в 30 секунд: [время проверки, строка, datetime]
+_today_cache = [0, "", datetime.min]
+
+def _refresh_today():
+    t = int(time.time())
+    if t - _today_cache[0] > 30:
+        now = datetime.now()
+        _today_cache[:] = [t, now.strftime("%Y-%m-%d"), now]
+
+
+def today_str() -> str:
+    _refresh_today()
+    return _today_cache[1]
+
+
+def _now() -> datetime:
+    _refresh_today()
+    return _today_cache[2]
+
+
 def validate_date_range(date_str: str):
     try:
-        dt = datetime.strptime(date_str, "%Y-%m-%d")
-        now = datetime.now()
+        dt = _parse_date(date_str)
+        now = _now()
         if dt < now - timedelta(days=365*2) or dt > now + timedelta(days=365*2):
             raise HTTPException(
                 status_code=400, 
@@ -237,7 +580,7 @@ async def get_schedule(
     validate_group(group)
     
     if not date:
-        date = datetime.now().strftime("%Y-%m-%d")
+        date = today_str()
     else:
         validate_date_range(date)
 
@@ -257,14 +600,14 @@ async def get_weekly_schedule(
 ):
     validate_group(group)
     if not date:
-        date_dt = datetime.now()
+        date_dt = _now()
     else:
         date_dt = validate_date_range(date)
     monday = date_dt - timedelta(days=date_dt.weekday())
     week_dates = [(monday + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
     tasks = [get_day_schedule(group, d) for d in week_dates]
     results = await asyncio.gather(*tasks)
-    
+
     weekly_schedule = []
     for d, s in zip(week_dates, results):
         weekly_schedule.append({